@@ -4,7 +4,7 @@
 Enhanced Social Media Crawler with Streamlit GUI
 Searches for specified keywords in URLs, content, and redirects on a social media profile.
 Features:
-- Web scraping with BeautifulSoup
+- Web scraping with lxml
 - Selenium for dynamic loading
 - Configurable keywords
 - CSV export of results
@@ -12,43 +12,177 @@ Features:
 
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup, FeatureNotFound
+from lxml import etree
 from urllib.parse import urljoin, urlparse, parse_qs, unquote, urlunparse
 from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 import csv
+import functools
 import datetime
 import re
+import threading
 import time
 from io import StringIO
-import hashlib
 import html
 import tldextract
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 from urllib3.util import Retry
 from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
+_ASSET_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.svg', '.pdf', '.zip', '.rar',
+               '.css', '.js', '.xml', '.json')
+_AUTH_PATH_SUFFIXES = ('/login', '/logout', '/register', '/signin', '/signout',
+                       '/cart', '/checkout', '/privacy', '/terms')
+_RE_CONTENT_PATH = re.compile(r'/(post|article|blog|news|story|travel|guide|destination|affiliate|status|video|reel|short|channel|playlist)/')
+_RE_META_REFRESH = re.compile(r'url=(.+)', re.I)
+_RE_REFRESH = re.compile('^refresh$', re.I)
+_RE_SCRIPT_REDIRECT = re.compile(
+    r'(?:window\.location(?:\.href)?\s*=\s*|window\.location\.replace\(|window\.open\(|'
+    r'location\.href\s*=\s*|location\.replace\(|url:\s*|href=)'
+    r'[\'"]([^\'"\n]{11,})[\'"]'
+)
+_RE_STATUS_PATH = re.compile(r'/status/\d+')
+_RE_TCO_LINK = re.compile(r'https?:(?:\\?/){2}t\.co\\?/[A-Za-z0-9]+')
+_RE_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_:.-]+)', re.I)
+_BLOCKED_RESOURCE_PATTERNS = tuple(f'*.{ext}{suffix}' for ext in ('css', 'woff', 'woff2', 'ttf', 'otf', 'eot')
+                                   for suffix in ('', '?*'))
+_SCAN_TAGS = ('a', 'script', 'meta')
+_FEED_CHUNK_SIZE = 64 * 1024
+RESULT_FIELDS = ('source_url', 'matched_url', 'keyword', 'location_type',
+                 'element', 'attribute', 'content', 'timestamp')
+CSV_HEADER = ('source_url', 'matched_url', 'keyword', 'location_type',
+              'element', 'attribute', 'content_sample', 'timestamp')
+_AFFILIATE_PARAMS = frozenset(['aff', 'affid', 'affiliateid', 'ref', 'refid', 'referral',
+                               'referralid', 'partner', 'partnerId', 'utm_source'])
+_RE_TRACKING_PARAM = re.compile(r'utm_|ref|aff|source|campaign|medium')
+_REDIRECT_PARAMS = ('redirect_to', 'redirect', 'url', 'link', 'goto', 'target', 'ued')
+_X_DOMAINS = ('x.com', 'twitter.com')
+_JS_DOMAINS = ('x.com', 'twitter.com', 'youtube.com', 'instagram.com',
+               'facebook.com', 'tiktok.com', 'linkedin.com')
+
+@functools.lru_cache(maxsize=8192)
+def _extract_tld(url):
+    return tldextract.extract(url)
+
+@functools.lru_cache(maxsize=8192)
+def _normalize_url(url):
+    parsed = urlparse(url)
+    normalized = urlunparse((parsed.scheme, parsed.netloc, parsed.path,
+                            parsed.params, parsed.query, ''))
+    if normalized.endswith('/'):
+        normalized = normalized[:-1]
+    return normalized
+
+@functools.lru_cache(maxsize=8192)
+def _strip_tracking_params(url):
+    parsed = urlparse(url)
+    if 'utm_' not in parsed.query.lower():
+        return url
+    # Drop utm_* segments verbatim so the rest of the query keeps its original encoding
+    query = '&'.join(part for part in parsed.query.split('&')
+                     if part and not part.lower().startswith('utm_'))
+    return _normalize_url(urlunparse(parsed._replace(query=query)))
+
+@functools.lru_cache(maxsize=1024)
+def _format_timestamp(seconds):
+    return datetime.datetime.fromtimestamp(seconds).strftime('%Y-%m-%d %H:%M:%S')
+
+def _decode_body(response, body):
+    # requests assumes ISO-8859-1 for text/* without a charset, whereas a browser
+    # honours the page's <meta charset>; only trust the header when it names one
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        encoding = response.encoding
+    else:
+        match = _RE_META_CHARSET.search(body[:4096])
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return body.decode(encoding or 'utf-8', errors='replace')
+    except (LookupError, TypeError):
+        # Unknown charset label; fall back the same way response.text does
+        return body.decode('utf-8', errors='replace')
+
+def _iter_elements(html_content, tags=_SCAN_TAGS):
+    # Feed the page to libxml2 incrementally and hand out only the tags we scan,
+    # clearing each one afterwards so its text and children are released early
+    if not html_content:
+        return
+    parser = etree.HTMLPullParser(events=('end',), tag=tags)
+    for start in range(0, len(html_content), _FEED_CHUNK_SIZE):
+        parser.feed(html_content[start:start + _FEED_CHUNK_SIZE])
+        for _, elem in parser.read_events():
+            yield elem
+            elem.clear()
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        return
+    for _, elem in parser.read_events():
+        yield elem
+        elem.clear()
+
+@st.cache_resource
+def _driver_path():
+    # Resolved once per Streamlit process instead of once per crawl
+    return ChromeDriverManager().install()
+
+class _SubstringScanner:
+    # Fallback with the same iter() interface as ahocorasick.Automaton when pyahocorasick is missing
+    def __init__(self, words):
+        self.words = tuple(words)
+    
+    def iter(self, text):
+        for word in self.words:
+            index = text.find(word)
+            if index != -1:
+                yield index + len(word) - 1, word
+
+def _build_automaton(words):
+    if ahocorasick is None:
+        return _SubstringScanner(words)
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
 class EnhancedWebCrawler:
     def __init__(self, start_url, keywords=None, status_callback=None):
         self.session = self._create_session()
         self.start_url = start_url
         self.keywords = keywords if keywords else ["gowithguide", "go with guide", "go-with-guide"]
+        self._keywords_lower = [(kw, kw.lower()) for kw in self.keywords]
+        self._keyword_automaton = _build_automaton({kw_lower for _, kw_lower in self._keywords_lower})
         self.main_domain = urlparse(start_url).netloc
         self.max_pages = 5000  # Equivalent to original "Complete" mode
+        self.fetch_workers = 8
+        self.redirect_workers = 16
+        self.max_requests_per_host = 8
+        self.max_page_bytes = 2 * 1024 * 1024
+        self.progress_interval = 10  # Report every Nth page to keep UI updates cheap
+        self._host_slots = {}
         self.visited = set()
-        self.results = []
+        self._cols = {field: [] for field in RESULT_FIELDS}
         self.queue = deque([start_url])
+        self.queued = {start_url}
         self.user_stopped = False
         self.pages_crawled = 0
         self.redirect_cache = {}
         self.internal_links = set()
-        self.known_shorteners = [
+        self.known_shorteners = frozenset([
             'bit.ly', 'tinyurl.com', 'goo.gl', 't.co', 'ow.ly', 'is.gd',
             'buff.ly', 'adf.ly', 'bit.do', 'mcaf.ee', 'su.pr', 'tiny.cc',
             'tidd.ly', 'redirectingat.com', 'go.redirectingat.com', 'go.skimresources.com'
-        ]
+        ])
         self.awin_domains = ['awin1.com', 'zenaps.com']
         self.potential_affiliate_domains = [
             'track.', 'go.', 'click.', 'buy.', 'shop.', 'link.', 'visit.',
@@ -62,21 +196,31 @@ class EnhancedWebCrawler:
             'site', 'url', 'link', 'goto', 'target', 'redirect', 'redirect_to',
             'dest', 'destination', 'u', 'to', 'out', 'away', 'href'
         ]
+        self._affiliate_netloc_automaton = _build_automaton(
+            self.known_shorteners.union(self.potential_affiliate_domains))
+        self._affiliate_path_automaton = _build_automaton(self.potential_affiliate_paths)
         self.crawled_pages_content = {}
         self.url_fragments_checked = set()
         self.status_callback = status_callback
         self.driver = None
+        self.redirect_executor = None
+        self.follow_status_pages = True
         self._detect_social_media()
+        self._start_tld = _extract_tld(self.start_url)
     
     def _detect_social_media(self):
         parsed = urlparse(self.start_url)
         path_parts = parsed.path.strip('/').split('/')
-        if 'x.com' in self.main_domain or 'twitter.com' in self.main_domain:
+        netloc = self.main_domain.lower()
+        if any(netloc == domain or netloc.endswith('.' + domain) for domain in _X_DOMAINS):
             if path_parts:
                 self.username = path_parts[0]
             if self.username:
                 self.start_url = f'https://{self.main_domain}/{self.username}/with_replies'
                 self.queue = deque([self.start_url])
+                self.queued = {self.start_url}
+            # Each tweet's t.co links are already on the timeline, so rendering every status page is redundant
+            self.follow_status_pages = False
     
     def _create_session(self):
         session = requests.Session()
@@ -86,9 +230,10 @@ class EnhancedWebCrawler:
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["GET", "HEAD"]
         )
-        adapter = HTTPAdapter(max_retries=retries)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
+        session.max_redirects = 10
         session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -99,17 +244,43 @@ class EnhancedWebCrawler:
         })
         return session
     
-    def get_soup(self, html_content):
+    def _create_driver(self):
+        options = Options()
+        options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        # Only the DOM is scanned, so skip images
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2
+        })
+        options.page_load_strategy = 'eager'
+        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+        options.binary_location = "/usr/bin/chromium-browser"  # For cloud compatibility
+        driver = webdriver.Chrome(service=Service(_driver_path()), options=options)
+        # Chrome has no content setting for stylesheets or fonts; block them at the network layer
         try:
-            return BeautifulSoup(html_content, 'lxml')
-        except FeatureNotFound:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(_BLOCKED_RESOURCE_PATTERNS)})
+        except Exception as e:
+            # Only a bandwidth saving; keep the driver with images-only blocking
             if self.status_callback:
-                self.status_callback("Warning: 'lxml' parser not found. Using 'html.parser' instead.")
-            return BeautifulSoup(html_content, 'html.parser')
+                self.status_callback(f"Could not block stylesheets and fonts: {str(e)}")
+        return driver
+    
+    def quit_driver(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
     
     def is_same_domain(self, url):
-        main_domain_parts = tldextract.extract(self.start_url)
-        url_domain_parts = tldextract.extract(url)
+        main_domain_parts = self._start_tld
+        url_domain_parts = _extract_tld(url)
         return (main_domain_parts.domain == url_domain_parts.domain and
                 main_domain_parts.suffix == url_domain_parts.suffix)
     
@@ -121,61 +292,58 @@ class EnhancedWebCrawler:
     def is_relevant_path(self, url):
         parsed_url = urlparse(url)
         path = parsed_url.path.lower()
-        if re.search(r'\.(jpg|jpeg|png|gif|svg|pdf|zip|rar|css|js|xml|json)$', path):
+        if path.endswith(_ASSET_EXTS):
             return False
-        if re.search(r'/(login|logout|register|signin|signout|cart|checkout|privacy|terms)/?$', path):
+        if (path[:-1] if path.endswith('/') else path).endswith(_AUTH_PATH_SUFFIXES):
             return False
-        if re.search(r'/(post|article|blog|news|story|travel|guide|destination|affiliate|status|video|reel|short|channel|playlist)/', path):
+        if _RE_CONTENT_PATH.search(path):
             return True
         if len(parse_qs(parsed_url.query)) > 3:
             return False
         return True
     
     def normalize_url(self, url):
-        parsed = urlparse(url)
-        normalized = urlunparse((parsed.scheme, parsed.netloc, parsed.path,
-                                parsed.params, parsed.query, ''))
-        if normalized.endswith('/'):
-            normalized = normalized[:-1]
-        return normalized
+        return _normalize_url(url)
     
     def looks_like_affiliate_url(self, url):
-        url_lower = url.lower()
+        return self._looks_like_affiliate_lowered(url.lower())
+    
+    def _looks_like_affiliate_lowered(self, url_lower):
         parsed_url = urlparse(url_lower)
         netloc = parsed_url.netloc
         path = parsed_url.path
         
-        if any(shortener in netloc for shortener in self.known_shorteners):
+        if netloc in self.known_shorteners:
             return True
         
-        if any(tracker in netloc for tracker in self.potential_affiliate_domains):
+        # Shorteners and tracker prefixes are matched as substrings of the netloc in one pass
+        if next(self._affiliate_netloc_automaton.iter(netloc), None) is not None:
             return True
         
+        query_params = parse_qs(parsed_url.query) if parsed_url.query else {}
+        
         if any(domain in netloc for domain in self.awin_domains):
-            query_params = parse_qs(parsed_url.query)
             if 'v' in query_params and query_params['v'][0] == '87121':
                 return True
             if 'awinmid' in query_params and query_params['awinmid'][0] == '87121':
                 return True
         
-        if any(aff_path in path for aff_path in self.potential_affiliate_paths):
+        if next(self._affiliate_path_automaton.iter(path), None) is not None:
             return True
         
-        query_params = parse_qs(parsed_url.query)
-        affiliate_params = ['aff', 'affid', 'affiliateid', 'ref', 'refid', 'referral',
-                           'referralid', 'partner', 'partnerId', 'utm_source']
-        for param in affiliate_params:
-            if param in query_params:
-                return True
+        if not query_params:
+            return False
+        
+        if not _AFFILIATE_PARAMS.isdisjoint(query_params):
+            return True
         
         for param in self.potential_affiliate_params:
             if param in query_params:
                 param_value = query_params[param][0].lower()
-                if any(keyword in param_value for keyword in self.keywords):
+                if next(self._keyword_automaton.iter(param_value), None) is not None:
                     return True
         
-        tracking_params = ['utm_', 'ref', 'aff', 'source', 'campaign', 'medium']
-        tracking_count = sum(1 for param in query_params if any(t in param for t in tracking_params))
+        tracking_count = sum(1 for param in query_params if _RE_TRACKING_PARAM.search(param))
         if tracking_count >= 2:
             return True
         
@@ -186,50 +354,63 @@ class EnhancedWebCrawler:
         
         return False
     
-    def extract_redirection_url(self, html_content, url):
-        soup = self.get_soup(html_content)
+    def extract_query_redirects(self, url):
         redirect_urls = []
-        meta_refresh = soup.find('meta', attrs={'http-equiv': re.compile('^refresh$', re.I)})
-        if meta_refresh and meta_refresh.get('content'):
-            match = re.search(r'url=(.+)', meta_refresh['content'], re.I)
-            if match:
-                redirect_url = match.group(1).strip()
-                redirect_urls.append(urljoin(url, redirect_url))
-        script_patterns = [
-            r'window\.location(?:\.href)?\s*=\s*[\'"](.+?)[\'"]',
-            r'window\.location\.replace\([\'"](.+?)[\'"]\)',
-            r'window\.open\([\'"](.+?)[\'"]\)',
-            r'location\.href\s*=\s*[\'"](.+?)[\'"]',
-            r'location\.replace\([\'"](.+?)[\'"]\)',
-            r'setTimeout\([\'"]window\.location\.href=[\'"](.+?)[\'"][\'"]',
-            r'url:\s*[\'"](.+?)[\'"]',
-            r'href=[\'"](.+?)[\'"]'
-        ]
-        scripts = soup.find_all('script')
-        for script in scripts:
-            if script.string:
-                for pattern in script_patterns:
-                    matches = re.findall(pattern, script.string)
-                    for match in matches:
-                        if len(match) > 10:
-                            redirect_urls.append(urljoin(url, match))
         parsed_url = urlparse(url)
+        if not parsed_url.query:
+            return redirect_urls
         query_params = parse_qs(parsed_url.query)
-        redirect_params = ['redirect_to', 'redirect', 'url', 'link', 'goto', 'target', 'ued']
-        for param in redirect_params:
+        for param in _REDIRECT_PARAMS:
             if param in query_params:
                 decoded_url = unquote(query_params[param][0])
                 redirect_urls.append(urljoin(url, decoded_url))
         return redirect_urls
     
-    def check_url_for_keywords(self, url, source_url):
+    def _scan_page(self, html_content, url):
+        # One pass over the page: anchors feed the BFS and keyword checks, meta refresh
+        # and inline scripts yield redirect targets
+        links = []
+        page_urls = []
+        redirect_urls = []
+        seen_refresh = False
+        for elem in _iter_elements(html_content):
+            tag = elem.tag
+            if tag == 'a':
+                href = elem.get('href')
+                if not href:
+                    continue
+                absolute_url = self.normalize_url(urljoin(url, href))
+                if self.is_same_domain(absolute_url) or self.is_subdomain_of(urlparse(absolute_url).netloc):
+                    # utm_* variants of a page are the same page; crawl it once
+                    crawl_url = _strip_tracking_params(absolute_url)
+                    if self.is_relevant_path(crawl_url) and (
+                            self.follow_status_pages or not _RE_STATUS_PATH.search(crawl_url)):
+                        links.append(crawl_url)
+                        self.internal_links.add(crawl_url)
+                page_urls.append(absolute_url)
+            elif tag == 'script':
+                if elem.text:
+                    for match in _RE_SCRIPT_REDIRECT.findall(elem.text):
+                        redirect_urls.append(urljoin(url, match))
+            elif not seen_refresh and _RE_REFRESH.match(elem.get('http-equiv', '')):
+                seen_refresh = True
+                match = _RE_META_REFRESH.search(elem.get('content', ''))
+                if match:
+                    redirect_urls.append(urljoin(url, match.group(1).strip()))
+        if not self.follow_status_pages:
+            # t.co links embedded in the timeline's inline JSON, with or without escaped slashes
+            page_urls.extend(match.replace('\\/', '/') for match in _RE_TCO_LINK.findall(html_content))
+        redirect_urls.extend(self.extract_query_redirects(url))
+        return links, page_urls, redirect_urls
+    
+    def check_url_for_keywords(self, url, source_url, is_affiliate=None):
         if not url or not isinstance(url, str):
             return
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        if url_hash in self.url_fragments_checked:
+        if url in self.url_fragments_checked:
             return
-        self.url_fragments_checked.add(url_hash)
-        matched_kws = self.get_matched_keywords(url)
+        self.url_fragments_checked.add(url)
+        url_lower = url.lower()
+        matched_kws = self.get_matched_keywords_lowered(url_lower)
         if matched_kws:
             self.add_result(
                 source_url=source_url,
@@ -240,7 +421,9 @@ class EnhancedWebCrawler:
                 keywords=matched_kws,
                 location_type='direct_url'
             )
-        if self.looks_like_affiliate_url(url):
+        if is_affiliate is None:
+            is_affiliate = self._looks_like_affiliate_lowered(url_lower)
+        if is_affiliate:
             final_url = self.resolve_redirects(url)
             if final_url != url:
                 matched_kws_final = self.get_matched_keywords(final_url)
@@ -258,75 +441,143 @@ class EnhancedWebCrawler:
     def get_matched_keywords(self, text):
         if not text or not isinstance(text, str):
             return []
-        matched = []
-        text_lower = text.lower()
-        for keyword in self.keywords:
-            if keyword.lower() in text_lower:
-                matched.append(keyword)
-        return matched
+        return self.get_matched_keywords_lowered(text.lower())
+    
+    def get_matched_keywords_lowered(self, text_lower):
+        found = {kw for _, kw in self._keyword_automaton.iter(text_lower)}
+        if not found:
+            return []
+        return [keyword for keyword, keyword_lower in self._keywords_lower if keyword_lower in found]
     
     def add_result(self, source_url, matched_url, element, attribute, content, keywords, location_type):
-        result = {
-            'source_url': source_url,
-            'matched_url': matched_url,
-            'keyword': ', '.join(keywords),
-            'location_type': location_type,
-            'element': element,
-            'attribute': attribute,
-            'content': content,
-            'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-        self.results.append(result)
+        keyword = ', '.join(keywords)
+        cols = self._cols
+        cols['source_url'].append(source_url)
+        cols['matched_url'].append(matched_url)
+        cols['keyword'].append(keyword)
+        cols['location_type'].append(location_type)
+        cols['element'].append(element)
+        cols['attribute'].append(attribute)
+        cols['content'].append(content)
+        # Formatted on export; matches found in the same second share one formatted string
+        cols['timestamp'].append(int(time.time()))
         if self.status_callback:
-            self.status_callback(f"Found match: {matched_url} (Keyword: {result['keyword']})")
+            self.status_callback(f"Found match: {matched_url} (Keyword: {keyword})")
+    
+    @property
+    def result_count(self):
+        return len(self._cols['source_url'])
+    
+    @property
+    def results(self):
+        return [dict(zip(RESULT_FIELDS, row)) for row in self.result_rows()]
+    
+    def result_rows(self):
+        cols = self._cols
+        return zip(*(cols[field] for field in RESULT_FIELDS[:-1]),
+                   map(_format_timestamp, cols['timestamp']))
     
     def resolve_redirects(self, url):
         if url in self.redirect_cache:
             return self.redirect_cache[url]
         try:
-            response = self.session.head(url, allow_redirects=True, timeout=5)
+            with self._host_slot(url):
+                response = self.session.head(url, allow_redirects=True, timeout=5)
+                if response.status_code in (405, 501):
+                    # Some trackers reject HEAD; follow the chain with GET but skip the body
+                    response = self.session.get(url, allow_redirects=True, timeout=5, stream=True)
+                    response.close()
             final_url = response.url
+            # Every hop in the chain ends at the same place, so links sharing a chain skip the network
+            for hop in response.history:
+                self.redirect_cache.setdefault(hop.url, final_url)
             self.redirect_cache[url] = final_url
         except requests.RequestException:
             final_url = url
             self.redirect_cache[url] = url
         return final_url
     
-    def process_url(self, url):
-        if url in self.visited or self.pages_crawled >= self.max_pages or not url or self.user_stopped:
-            return []
-        self.visited.add(url)
-        self.pages_crawled += 1
-        if self.status_callback:
-            self.status_callback(f"Processing page {self.pages_crawled}: {url}")
+    def prefetch_redirects(self, urls):
+        # Links already checked on an earlier page are skipped by check_url_for_keywords,
+        # so classify only new ones and hand the verdicts back for the checks that follow
+        affiliate_urls = {u for u in urls
+                          if u and u not in self.url_fragments_checked and self.looks_like_affiliate_url(u)}
+        pending = [u for u in affiliate_urls if u not in self.redirect_cache]
+        if not pending:
+            return affiliate_urls
+        # resolve_redirects fills redirect_cache, so the keyword checks that follow hit the cache
+        if self.redirect_executor is not None:
+            list(self.redirect_executor.map(self.resolve_redirects, pending))
+            return affiliate_urls
+        with ThreadPoolExecutor(max_workers=min(self.redirect_workers, len(pending))) as executor:
+            list(executor.map(self.resolve_redirects, pending))
+        return affiliate_urls
+    
+    def needs_js(self, url):
+        netloc = urlparse(url).netloc.lower()
+        return any(netloc == domain or netloc.endswith('.' + domain) for domain in _JS_DOMAINS)
+    
+    def _host_slot(self, url):
+        # setdefault is atomic, so worker threads agree on one semaphore per host
+        return self._host_slots.setdefault(
+            urlparse(url).netloc, threading.BoundedSemaphore(self.max_requests_per_host))
+    
+    def fetch_static(self, url):
+        with self._host_slot(url):
+            response = self.session.get(url, timeout=15, stream=True)
+            try:
+                response.raise_for_status()
+                # Cap the download so one oversized page cannot tie up a worker
+                body = response.raw.read(self.max_page_bytes, decode_content=True)
+            finally:
+                response.close()
+        return _decode_body(response, body)
+    
+    def fetch_rendered(self, url):
+        # Use Selenium for dynamic loading
         try:
-            # Use Selenium for dynamic loading
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
-            options.binary_location = "/usr/bin/chromium-browser"  # For cloud compatibility
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+            if self.driver is None:
+                self.driver = self._create_driver()
+            else:
+                self.driver.delete_all_cookies()
             self.driver.get(url)
-            time.sleep(2)  # Initial load
+            try:
+                # Initial load: wait for the document to finish rather than a fixed 2s
+                WebDriverWait(self.driver, 2, poll_frequency=0.15).until(
+                    lambda d: d.execute_script("return document.readyState") == "complete")
+            except TimeoutException:
+                pass
             last_height = self.driver.execute_script("return document.body.scrollHeight")
             while not self.user_stopped:
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
+                try:
+                    # Continue as soon as the page grows instead of sleeping a fixed interval
+                    WebDriverWait(self.driver, 3, poll_frequency=0.15).until(
+                        lambda d: d.execute_script("return document.body.scrollHeight") > last_height)
+                except TimeoutException:
                     break
-                last_height = new_height
-            html_content = self.driver.page_source
-            self.driver.quit()
-            self.driver = None
+                last_height = self.driver.execute_script("return document.body.scrollHeight")
+            return self.driver.page_source
+        except Exception:
+            self.quit_driver()
+            raise
+    
+    def process_url(self, url, prefetched=None):
+        if url in self.visited or self.pages_crawled >= self.max_pages or not url or self.user_stopped:
+            return []
+        self.visited.add(url)
+        self.pages_crawled += 1
+        if self.status_callback and (self.pages_crawled - 1) % self.progress_interval == 0:
+            self.status_callback(f"Processing page {self.pages_crawled}: {url}")
+        try:
+            if prefetched is not None:
+                html_content = prefetched.result()
+            elif self.needs_js(url):
+                html_content = self.fetch_rendered(url)
+            else:
+                html_content = self.fetch_static(url)
             
-            soup = self.get_soup(html_content)
-            matched_kws = self.get_matched_keywords(html_content)
+            matched_kws = self.get_matched_keywords_lowered(html_content.lower())
             if matched_kws:
                 self.add_result(
                     source_url=url,
@@ -337,20 +588,12 @@ class EnhancedWebCrawler:
                     keywords=matched_kws,
                     location_type='content'
                 )
-            redirect_urls = self.extract_redirection_url(html_content, url)
+            links, page_urls, redirect_urls = self._scan_page(html_content, url)
+            affiliate_urls = self.prefetch_redirects(redirect_urls + page_urls)
             for redirect_url in redirect_urls:
-                self.check_url_for_keywords(redirect_url, url)
-            links = []
-            for a_tag in soup.find_all('a', href=True):
-                href = a_tag.get('href')
-                if not href:
-                    continue
-                absolute_url = urljoin(url, href)
-                absolute_url = self.normalize_url(absolute_url)
-                if (self.is_same_domain(absolute_url) or self.is_subdomain_of(urlparse(absolute_url).netloc)) and self.is_relevant_path(absolute_url):
-                    links.append(absolute_url)
-                    self.internal_links.add(absolute_url)
-                self.check_url_for_keywords(absolute_url, url)
+                self.check_url_for_keywords(redirect_url, url, redirect_url in affiliate_urls)
+            for absolute_url in page_urls:
+                self.check_url_for_keywords(absolute_url, url, absolute_url in affiliate_urls)
             return links
         except Exception as e:
             if self.status_callback:
@@ -361,50 +604,83 @@ class EnhancedWebCrawler:
         self.reset_state()
         if self.status_callback:
             self.status_callback(f"Starting crawl of {self.start_url}")
-        while self.queue and not self.user_stopped and self.pages_crawled < self.max_pages:
-            url = self.queue.popleft()
-            new_urls = self.process_url(url)
-            for new_url in new_urls:
-                if (new_url not in self.visited and new_url not in self.queue and
-                        self.pages_crawled < self.max_pages):
-                    self.queue.append(new_url)
-            if self.results:
-                if self.status_callback:
-                    self.status_callback(f"Found {len(self.results)} matches")
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor, \
+                    ThreadPoolExecutor(max_workers=self.redirect_workers) as self.redirect_executor:
+                window = deque()
+                reported_count = 0
+                while (window or self.queue) and not self.user_stopped and self.pages_crawled < self.max_pages:
+                    self._fill_window(window, executor)
+                    if not window:
+                        break
+                    url, prefetched = window.popleft()
+                    self.queued.discard(url)
+                    new_urls = self.process_url(url, prefetched)
+                    for new_url in new_urls:
+                        if (new_url not in self.visited and new_url not in self.queued and
+                                self.pages_crawled < self.max_pages):
+                            self.queue.append(new_url)
+                            self.queued.add(new_url)
+                    if self.result_count != reported_count:
+                        reported_count = self.result_count
+                        if self.status_callback:
+                            self.status_callback(f"Found {self.result_count} matches")
+                for _, prefetched in window:
+                    if prefetched is not None:
+                        prefetched.cancel()
+        finally:
+            self.redirect_executor = None
+            self.quit_driver()
         if self.status_callback:
             self.status_callback("Crawling completed")
         return self.results
     
+    def _fill_window(self, window, executor):
+        # Keep up to fetch_workers static pages downloading ahead of the page being processed.
+        # URLs stay in self.queued until processed so they are never scheduled twice
+        limit = min(self.fetch_workers, self.max_pages - self.pages_crawled)
+        while self.queue and len(window) < limit:
+            url = self.queue.popleft()
+            if url in self.visited:
+                self.queued.discard(url)
+                continue
+            prefetched = None if self.needs_js(url) else executor.submit(self.fetch_static, url)
+            window.append((url, prefetched))
+    
     def reset_state(self):
         self.visited = set()
         self.queue = deque([self.start_url])
-        self.results = []
+        self.queued = {self.start_url}
+        self._cols = {field: [] for field in RESULT_FIELDS}
         self.pages_crawled = 0
         self.redirect_cache = {}
         self.internal_links = set()
         self.crawled_pages_content = {}
         self.url_fragments_checked = set()
 
-def generate_csv(results):
+def _csv_row(row):
+    source_url, matched_url, keyword, location_type, element, attribute, content, timestamp = row
+    return (source_url, matched_url, keyword, location_type, element, attribute,
+            content[:300] if content else '', timestamp)
+
+def iter_csv(rows, chunk_size=1024):
     csv_file = StringIO()
-    writer = csv.DictWriter(csv_file, fieldnames=[
-        'source_url', 'matched_url', 'keyword',
-        'location_type', 'element', 'attribute',
-        'content_sample', 'timestamp'
-    ])
-    writer.writeheader()
-    for result in results:
-        writer.writerow({
-            'source_url': result['source_url'],
-            'matched_url': result['matched_url'],
-            'keyword': result['keyword'],
-            'location_type': result['location_type'],
-            'element': result['element'],
-            'attribute': result['attribute'],
-            'content_sample': result['content'][:300] if result['content'] else '',
-            'timestamp': result['timestamp']
-        })
-    return csv_file.getvalue()
+    writer = csv.writer(csv_file)
+    writer.writerow(CSV_HEADER)
+    rows = iter(rows)
+    while True:
+        chunk = [_csv_row(row) for row in islice(rows, chunk_size)]
+        writer.writerows(chunk)
+        data = csv_file.getvalue()
+        if data:
+            yield data.encode('utf-8')
+        if not chunk:
+            break
+        csv_file.seek(0)
+        csv_file.truncate(0)
+
+def generate_csv(rows):
+    return b''.join(iter_csv(rows))
 
 # Streamlit GUI
 st.header("Crawler Settings")
@@ -417,10 +693,11 @@ if st.button("Start Crawling"):
         st.error("Please provide a URL and keywords.")
     else:
         crawler = EnhancedWebCrawler(profile_url, keywords, status_callback=st.write)
-        results = crawler.start_crawling()
-        if results:
-            st.success(f"Found {len(results)} matches.")
-            csv_data = generate_csv(results)
+        crawler.start_crawling()
+        match_count = crawler.result_count
+        if match_count:
+            st.success(f"Found {match_count} matches.")
+            csv_data = generate_csv(crawler.result_rows())
             st.download_button("Download CSV", csv_data, file_name="crawl_results.csv", mime="text/csv")
         else:
             st.info("No matches found.")